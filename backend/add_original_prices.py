@@ -1,25 +1,36 @@
-import json
-import random
+import os
+import sys
+
+import numpy as np
+import orjson
 
 # Read the products
-with open('product.json', 'r', encoding='utf-8') as f:
-    products = json.load(f)
+with open('product.json', 'rb') as f:
+    products = orjson.loads(f.read())
 
 # Add originalPrice to each product (15-40% higher than current price)
-for product in products:
-    if 'originalPrice' not in product:
-        current_price = product['price']
-        # Calculate original price (20-35% more than current price)
-        discount_percent = random.randint(20, 35)
-        original_price = int(current_price * (100 + discount_percent) / 100)
-        product['originalPrice'] = original_price
+missing = [product for product in products if 'originalPrice' not in product]
+prices = np.fromiter((product['price'] for product in missing), dtype=np.float64, count=len(missing))
+# Calculate original price (20-35% more than current price) for all products at once
+rng = np.random.default_rng()
+discount_percent = rng.integers(20, 36, size=prices.size)
+original_prices = (prices * (100 + discount_percent) / 100).astype(np.int64)
+for product, original_price in zip(missing, original_prices.tolist()):
+    product['originalPrice'] = original_price
 
-# Save back
-with open('product.json', 'w', encoding='utf-8') as f:
-    json.dump(products, f, indent=4, ensure_ascii=False)
+# Save back (compact by default; pass --pretty for a human-readable file)
+dump_option = orjson.OPT_INDENT_2 if '--pretty' in sys.argv[1:] else 0
+# Write a sibling temp file and swap it in, so the server's mtime-triggered
+# reload never sees a half-written product.json
+with open('product.json.tmp', 'wb') as f:
+    f.write(orjson.dumps(products, option=dump_option))
+os.replace('product.json.tmp', 'product.json')
 
 print(f"Added originalPrice to {len(products)} products!")
 print("Sample products:")
-for i, p in enumerate(products[:5]):
-    discount = int((1 - p['price']/p['originalPrice']) * 100)
+sample = products[:5]
+sample_prices = np.array([p['price'] for p in sample], dtype=np.float64)
+sample_originals = np.array([p['originalPrice'] for p in sample], dtype=np.float64)
+discounts = ((1 - sample_prices / sample_originals) * 100).astype(np.int64)
+for p, discount in zip(sample, discounts.tolist()):
     print(f"  {p['name']}: Rs.{p['originalPrice']} -> Rs.{p['price']} ({discount}% OFF)")
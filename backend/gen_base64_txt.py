@@ -1,10 +1,10 @@
 
-import base64
+import pybase64
 
 with open('upi_final.jpg', 'rb') as image_file:
-    encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
+    encoded_bytes = pybase64.b64encode(image_file.read())
 
-with open('base64_content.txt', 'w') as text_file:
-    text_file.write(encoded_string)
+with open('base64_content.txt', 'wb') as text_file:
+    text_file.write(encoded_bytes)
 
 print("Base64 generated")
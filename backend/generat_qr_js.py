@@ -1,12 +1,12 @@
 
-import base64
+import pybase64
 
-with open('upi.jpg', 'rb') as image_file:
-    encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
+CHUNK_SIZE = 57 * 1024
 
-js_content = f'window.upiImageSrc = "data:image/jpeg;base64,{encoded_string}";'
-
-with open('qr_data.js', 'w') as js_file:
-    js_file.write(js_content)
+with open('upi.jpg', 'rb') as image_file, open('qr_data.js', 'wb', buffering=1 << 20) as js_file:
+    js_file.write(b'window.upiImageSrc = "data:image/jpeg;base64,')
+    while chunk := image_file.read(CHUNK_SIZE):
+        js_file.write(pybase64.b64encode(chunk))
+    js_file.write(b'";')
 
 print("qr_data.js created successfully")
@@ -1,28 +1,45 @@
 
-import base64
+import pybase64
 import os
+import sys
 
 input_file = 'upi_final.jpg'
 output_file = 'assets/qr_final.js'
 
+# 57 KiB is a multiple of 3, so no '=' padding appears mid-stream
+CHUNK_SIZE = 57 * 1024
+
 if not os.path.exists('assets'):
     os.makedirs('assets')
 
-try:
-    with open(input_file, 'rb') as image_file:
-        # read binary
-        data = image_file.read()
-        # encode to base64 bytes
-        encoded_bytes = base64.b64encode(data)
-        # decode to utf-8 string, replace newlines just in case
-        encoded_string = encoded_bytes.decode('utf-8').replace('\n', '')
-
-    js_content = f'window.finalQR = "data:image/jpeg;base64,{encoded_string}";console.log("QR Data Loaded, length:", window.finalQR.length);'
+# Skip the re-encode when the JS is already newer than the image
+if (os.path.exists(input_file) and os.path.exists(output_file)
+        and os.path.getmtime(output_file) >= os.path.getmtime(input_file)):
+    print(f"{output_file} is up-to-date")
+    sys.exit(0)
 
-    with open(output_file, 'w') as js_file:
-        js_file.write(js_content)
+# Write next to the output and swap in only a complete file, so an interrupted
+# run can never leave a partial qr_final.js that looks up-to-date
+temp_file = output_file + '.tmp'
 
-    print(f"Successfully generated {output_file} with size {len(encoded_string)} chars")
+try:
+    try:
+        with open(input_file, 'rb') as image_file, open(temp_file, 'wb', buffering=1 << 20) as js_file:
+            js_file.write(b'window.finalQR = "data:image/jpeg;base64,')
+            # encode chunk by chunk straight into the output, never holding the whole image
+            while chunk := image_file.read(CHUNK_SIZE):
+                js_file.write(pybase64.b64encode(chunk))
+            js_file.write(b'";console.log("QR Data Loaded, length:", window.finalQR.length);')
+
+            encoded_length = 4 * ((os.fstat(image_file.fileno()).st_size + 2) // 3)
+
+        os.replace(temp_file, output_file)
+    finally:
+        # also runs on Ctrl-C, which the except below doesn't catch
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+    print(f"Successfully generated {output_file} with size {encoded_length} chars")
 
 except Exception as e:
     print(f"Error: {e}")
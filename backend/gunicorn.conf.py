@@ -0,0 +1,32 @@
+import multiprocessing
+import os
+
+# ---------------- GUNICORN CONFIG ---------------- #
+# Run with: gunicorn server:app
+#
+# gthread workers keep a pool of threads per process, so a request blocked
+# on the Gemini API only parks one thread instead of a whole worker.
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 10000)}"
+
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 16))
+
+# Gemini calls time out after 15s; leave headroom before killing a worker
+timeout = 60
+keepalive = 5
+
+# Heartbeat files in RAM, so a slow disk can't stall workers into timeouts
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+# gunicorn is the production entry point, so default both gunicorn's and the
+# app's logging to warning here; server.py reads the same LOG_LEVEL when the
+# workers import it. `python server.py` (local dev) keeps its INFO default.
+os.environ.setdefault("LOG_LEVEL", "warning")
+loglevel = os.environ["LOG_LEVEL"].lower()
+accesslog = "-"
+
+# Each worker keeps its own products cache and AI reply cache. Both are
+# rebuilt from product.json / Gemini on demand, so no cross-worker sync is needed.
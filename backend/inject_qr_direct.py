@@ -1,57 +1,53 @@
 
 import os
+import shutil
+import tempfile
+
+TARGET_STR = 'alt="Payment QR Code"'
 
 try:
     with open('base64_content.txt', 'r') as f:
-        base64_data = f.read().strip()
-    
-    with open('app.js', 'r', encoding='utf-8') as f:
-        js_content = f.read()
+        # base64 never contains whitespace, only a possible trailing newline
+        base64_data = f.read().rstrip()
     
     # We want to replace the img src with the direct data URI
     # Target line: <img src="${(window.finalQR) ? window.finalQR : 'assets/qr_final.jpg'}"
-    # We will just replace the whole QR container block to be safe and simple
-    
-    new_img_tag = f'<img src="data:image/jpeg;base64,{base64_data}"'
-    
-    # Simple string replacement for the img tag
-    # We will look for a unique substring to replace
-    
-    target_str = 'alt="Payment QR Code"'
-    # We'll construct the new line
-    new_line = f'                                        {new_img_tag} alt="Payment QR Code" style="width: 200px; height: 200px; object-fit: contain; display: block; margin: 0 auto; border: 1px solid #ddd;">'
-    
-    # Replacing the whole block is safer. Let's find the img tag using regex or split
-    # Actually, let's just use replace on the part we know is there from previous edits.
-    # Previous edit had: src="${(window.finalQR) ? window.finalQR : 'assets/qr_final.jpg'}" 
-    
-    import re
-    # Regex to find the img tag with alt="Payment QR Code"
-    # pattern = r'<img\s+src=.*?\s+alt="Payment QR Code".*?>'
-    
-    # Doing a simple read/replace of the previous known state
-    # Identify the previous src pattern
-    
-    # We will search for the specific lines to replace
     # We know the structure:
     # <div id="qr-container" ...>
     #    <p ...>...</p>
     #    <img ...>  <-- Replace this
     # </div>
     
-    lines = js_content.split('\n')
-    new_lines = []
-    for line in lines:
-        if 'alt="Payment QR Code"' in line:
-            # Replace this line entirely
-            new_lines.append(new_line)
-        else:
-            new_lines.append(line)
-            
-    final_content = '\n'.join(new_lines)
-    
-    with open('app.js', 'w', encoding='utf-8') as f:
-        f.write(final_content)
+    new_img_tag = f'<img src="data:image/jpeg;base64,{base64_data}" alt="Payment QR Code" style="width: 200px; height: 200px; object-fit: contain; display: block; margin: 0 auto; border: 1px solid #ddd;">'
+    
+    # Stream app.js line by line into a temp file next to it, so memory stays
+    # bounded and a crash never leaves a half-written app.js behind
+    replaced = False
+    dst = tempfile.NamedTemporaryFile('w', dir='.', delete=False, encoding='utf-8', newline='')
+    try:
+        with open('app.js', 'r', encoding='utf-8', newline='') as src, dst:
+            for line in src:
+                idx = line.find(TARGET_STR) if not replaced else -1
+                if idx != -1:
+                    # Splice out the enclosing <img ... > around the alt text
+                    start = line.rfind('<img', 0, idx)
+                    end = line.find('>', idx)
+                    if start != -1 and end != -1:
+                        line = line[:start] + new_img_tag + line[end + 1:]
+                        replaced = True
+                dst.write(line)
+        
+        if not replaced:
+            raise ValueError('Payment QR Code <img> tag not found in app.js')
+        
+        # NamedTemporaryFile is created 0600; keep app.js's original permissions
+        shutil.copymode('app.js', dst.name)
+        os.replace(dst.name, 'app.js')
+    finally:
+        # On any failure (bad encoding, missing tag, Ctrl-C) drop the temp file
+        dst.close()
+        if os.path.exists(dst.name):
+            os.remove(dst.name)
         
     print("Successfully injected base64 into app.js")
 
@@ -1,18 +1,72 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, send_file
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
-import json
+from flask_compress import Compress
+from cachetools import TTLCache
+import brotli
+import gzip
+import orjson
 import os
+import mmap
+import atexit
+import hashlib
 import logging
-import traceback
-import requests
+import logging.handlers
+import queue
+import threading
+import httpx
+from collections import namedtuple
 from datetime import datetime
 from dotenv import load_dotenv
 import random
 
 load_dotenv()
 
+# Request threads only enqueue records; a listener thread does the actual write
+log_queue = queue.SimpleQueue()
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# LOG_LEVEL is shared with gunicorn.conf.py, which defaults it to warning in production
+logging.basicConfig(
+    level=os.environ.get('LOG_LEVEL', 'INFO').upper(),
+    # The listener's handler adds timestamp and level; the queue side only renders the message
+    format='%(message)s',
+    handlers=[logging.handlers.QueueHandler(log_queue)],
+)
+# httpx logs every request URL at INFO, and the Gemini URL carries the API key
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+
+class OrjsonProvider(JSONProvider):
+    """Route jsonify() and request.get_json() through orjson."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype="application/json")
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+app.config.update(
+    COMPRESS_ALGORITHM=['br', 'gzip'],
+    COMPRESS_LEVEL=4,
+    COMPRESS_BR_LEVEL=4,
+    COMPRESS_MIN_SIZE=512,
+    # Chat prompts are small; refuse anything bigger before parsing it
+    MAX_CONTENT_LENGTH=64 * 1024,
+)
 CORS(app)
+Compress(app)
 
 # ---------------- CONFIG ---------------- #
 
@@ -23,56 +77,201 @@ if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR)
 
 PRODUCTS_FILE = os.path.join(BASE_DIR, 'product.json')
+QR_IMAGE_FILE = os.path.join(BASE_DIR, 'upi_final.jpg')
+
+GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={api_key}"
 
 # ---------------- GLOBAL DATA ---------------- #
 
 products_db = []
 
+# Everything /api/products serves, published as one object so readers never
+# mix the body of one catalog version with the ETag of another
+ProductsCache = namedtuple('ProductsCache', ['mtime', 'etag', 'body', 'compressed'])
+products_cache = None
+products_lock = threading.Lock()
+
+# Constant route bodies, encoded once instead of per request
+HOME_BODY = orjson.dumps({
+    "status": "Backend Running",
+    "message": "MyFruitMart API Live 🚀"
+})
+HEALTH_BODY = orjson.dumps({
+    "success": True,
+    "status": "online"
+})
+SERVER_ERROR_BODY = orjson.dumps({
+    "success": False,
+    "message": "Server error"
+})
+AI_ERROR_BODY = orjson.dumps({
+    "success": False,
+    "message": "AI system error"
+})
+
+# Full tracebacks cost milliseconds to format; only pay for them when asked
+VERBOSE_TB = os.environ.get('VERBOSE_TB', '').lower() in ('1', 'true', 'yes')
+
+# Gemini replies keyed by prompt digest; repeated questions skip the API call
+ai_cache = TTLCache(maxsize=1024, ttl=3600)
+ai_cache_lock = threading.Lock()
+
+# Shared HTTP/2 client: concurrent Gemini calls are multiplexed over one TLS connection
+# retries=1 retries a failed connect once (ConnectError/ConnectTimeout only;
+# a dead pooled socket surfacing as ReadError is not retried)
+gemini_client = httpx.Client(
+    timeout=15,
+    headers={'Content-Type': 'application/json'},
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=1,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    ),
+)
+
 # ---------------- HELPERS ---------------- #
 
 def safe_load_json(filepath, default_value):
     if os.path.exists(filepath):
         try:
-            with open(filepath, 'r') as f:
-                return json.load(f)
+            # Parse straight from the page cache instead of copying into a bytes object
+            with open(filepath, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                    memoryview(mm) as view:
+                return orjson.loads(view)
         except:
             return default_value
     return default_value
 
 
+def get_mtime(filepath):
+    try:
+        return os.stat(filepath).st_mtime_ns
+    except OSError:
+        return None
+
+
+def first_dict(value):
+    # First element of a list if it is a dict, else {}
+    if isinstance(value, list) and value and isinstance(value[0], dict):
+        return value[0]
+    return {}
+
+
+def extract_gemini_text(result):
+    # Walk candidates[0].content.parts[0].text; any missing, null or wrongly
+    # typed level yields None instead of raising
+    if not isinstance(result, dict):
+        return None
+    content = first_dict(result.get('candidates')).get('content')
+    if not isinstance(content, dict):
+        return None
+    text = first_dict(content.get('parts')).get('text')
+    return text if isinstance(text, str) else None
+
+
+def load_products():
+    global products_db, products_cache
+    with products_lock:
+        # stat before reading so a write landing mid-load triggers another reload
+        mtime = get_mtime(PRODUCTS_FILE)
+        current = products_cache
+        if current is not None and current.mtime == mtime:
+            # Another thread reloaded while we waited for the lock
+            return
+
+        loaded = safe_load_json(PRODUCTS_FILE, None)
+        if loaded is None and current is not None:
+            # Unreadable mid-edit: keep serving the last good catalog. Its mtime is
+            # left untouched so the next request re-parses; a fixed file may land in
+            # the same timestamp tick as the broken read
+            app.logger.warning("product.json could not be parsed; keeping previous catalog")
+            return
+
+        products_db = loaded if loaded is not None else []
+        body = orjson.dumps(products_db)
+        products_cache = ProductsCache(
+            mtime=mtime,
+            # Content hash, so a touch without edits (or a redeploy) keeps client caches valid
+            etag=hashlib.blake2b(body, digest_size=16).hexdigest(),
+            body=body,
+            # Compress once at max level here instead of on every request
+            compressed={
+                'br': brotli.compress(body, quality=11),
+                'gzip': gzip.compress(body, compresslevel=9),
+            },
+        )
+
+
 def load_data():
-    global products_db
-    products_db = safe_load_json(PRODUCTS_FILE, [])
+    load_products()
     print("Data loaded successfully.")
 
 # ---------------- ROUTES ---------------- #
 
 @app.route("/")
 def home():
-    return jsonify({
-        "status": "Backend Running",
-        "message": "MyFruitMart API Live 🚀"
-    })
+    return Response(HOME_BODY, mimetype='application/json')
 
 
 @app.route("/api/health")
 def health():
-    return jsonify({
-        "success": True,
-        "status": "online"
-    })
+    return Response(HEALTH_BODY, mimetype='application/json')
 
 
 @app.route("/api/products")
 def products():
-    return jsonify(products_db)
+    # Serve the pre-serialized catalog; re-encode only when product.json changes
+    if get_mtime(PRODUCTS_FILE) != products_cache.mtime:
+        load_products()
+
+    # Read the snapshot once so body and ETag always come from the same version
+    cache = products_cache
+    encoding = request.accept_encodings.best_match(list(cache.compressed))
+    response = Response(cache.compressed.get(encoding, cache.body), mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        # Already encoded, so Flask-Compress leaves this response alone
+        response.headers['Content-Encoding'] = encoding
+    response.set_etag(f"{cache.etag}-{encoding or 'identity'}")
+    return response.make_conditional(request)
+
+
+@app.route("/api/qr.jpg")
+def qr_image():
+    # Served as a real image so browsers cache it and revalidate with 304s
+    if not os.path.exists(QR_IMAGE_FILE):
+        return jsonify({
+            "success": False,
+            "message": "QR image not found"
+        }), 404
+
+    return send_file(QR_IMAGE_FILE, mimetype='image/jpeg', conditional=True, max_age=86400)
 
 
 @app.route("/api/ai-chat", methods=["POST"])
 def ai_chat():
+    # Outside the try so an oversized body surfaces as Flask's 413, not a 500
+    data = request.get_json(cache=False, silent=True)
+    prompt = data.get("prompt") if isinstance(data, dict) else None
+
+    # Reject before the cache lookup and the paid Gemini call
+    if not isinstance(prompt, str) or not prompt.strip():
+        return jsonify({
+            "success": False,
+            "message": "A non-empty 'prompt' string is required"
+        }), 400
+
     try:
-        data = request.json
-        prompt = data.get("prompt", "")
+        cache_key = hashlib.blake2b(prompt.encode('utf-8'), digest_size=16).digest()
+        with ai_cache_lock:
+            cached_reply = ai_cache.get(cache_key)
+        if cached_reply is not None:
+            return jsonify({
+                "success": True,
+                "response": cached_reply,
+                "cached": True
+            })
 
         api_key = os.getenv("GEMINI_API_KEY")
 
@@ -82,7 +281,7 @@ def ai_chat():
                 "message": "GEMINI_API_KEY not configured"
             }), 500
 
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={api_key}"
+        url = GEMINI_URL.format(api_key=api_key)
 
         payload = {
             "contents": [{
@@ -90,11 +289,21 @@ def ai_chat():
             }]
         }
 
-        r = requests.post(url, json=payload, timeout=15)
+        r = gemini_client.post(url, content=orjson.dumps(payload))
 
         if r.status_code == 200:
-            result = r.json()
-            reply = result['candidates'][0]['content']['parts'][0]['text']
+            try:
+                reply = extract_gemini_text(orjson.loads(r.content))
+            except orjson.JSONDecodeError:
+                reply = None
+            if not reply:
+                return jsonify({
+                    "success": False,
+                    "message": "Empty Gemini response"
+                }), 502
+
+            with ai_cache_lock:
+                ai_cache[cache_key] = reply
             return jsonify({
                 "success": True,
                 "response": reply
@@ -106,11 +315,16 @@ def ai_chat():
         }), 500
 
     except Exception as e:
-        print("AI ERROR:", traceback.format_exc())
-        return jsonify({
-            "success": False,
-            "message": "AI system error"
-        }), 500
+        if app.debug or VERBOSE_TB:
+            app.logger.exception("AI error")
+        else:
+            app.logger.error("AI error: %r", e)
+        return Response(AI_ERROR_BODY, status=500, mimetype='application/json')
+
+
+@app.errorhandler(500)
+def server_error(e):
+    return Response(SERVER_ERROR_BODY, status=500, mimetype='application/json')
 
 
 # ---------------- START ---------------- #